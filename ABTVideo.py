@@ -28,8 +28,12 @@ def run_abt_video_overlay():
             break
 
         # --- LOAD DATA ---
-        raw_df, _ = ReadRawData.ReadABT("Select the ABT file.")
-        df = Conversions.format_and_smooth_abt_data(raw_df)
+        minutes = input("Minutes of data to load before the end of the recording (blank = all): ").strip()
+        last_seconds = float(minutes) * 60 if minutes else None
+        raw_df, _ = ReadRawData.ReadABT("Select the ABT file.", last_seconds=last_seconds)
+        # Only the channels the overlay draws are computed, before df gets sliced into plain frames
+        df = Conversions.format_and_smooth_abt_data(raw_df).materialize(
+            ["Smoothed Altitude MSL (ft)", "Smoothed Acceleration (g)", "rate_of_descent_ftps"])
 
         # --- Let user pick landing in ABT data by clicking the graph interactively ---
         import matplotlib.pyplot as plt
@@ -89,6 +93,13 @@ def run_abt_video_overlay():
         plot_x = 0
         plot_y = frame_height - plot_height
 
+        # --- Per-frame lookups ---
+        # Every frame's data time is known up front, so one plan gives the nearest sample for all of
+        # them and the sorted times let each frame slice its windows instead of masking the whole frame
+        times = df['Time (s)'].to_numpy()
+        frame_plan = Conversions.ResamplePlan.cached(times, np.arange(total_frames) / fps - offset)
+        acc_max_so_far = np.fmax.accumulate(df['Smoothed Acceleration (g)'].to_numpy())
+
         with tqdm(total=total_frames, desc="Processing video frames") as pbar:
             while cap.isOpened():
                 ret, frame = cap.read()
@@ -101,7 +112,7 @@ def run_abt_video_overlay():
                 # --- Get windowed data ---
                 x_min = max(0, data_time - plot_win)
                 x_max = data_time + plot_win
-                plot_data = df[(df['Time (s)'] >= x_min) & (df['Time (s)'] <= x_max)]
+                plot_data = df.iloc[np.searchsorted(times, x_min, side="left"):np.searchsorted(times, x_max, side="right")]
 
                 # --- Draw plot background ---
                 overlay = frame.copy()
@@ -161,17 +172,21 @@ def run_abt_video_overlay():
                     cv2.line(frame, (curr_x, plot_y + margin), (curr_x, plot_y + plot_height - margin), (255, 255, 255), 2)
 
                 # --- Draw text display ---
-                idx = (df['Time (s)'] - data_time).abs().idxmin()
+                if frame_idx < len(frame_plan.nearest_index):
+                    idx = frame_plan.nearest_index[frame_idx]
+                else:  # The container reported fewer frames than it has
+                    idx = (df['Time (s)'] - data_time).abs().idxmin()
                 current_row = df.iloc[[idx]]
                 altitude = current_row['Smoothed Altitude MSL (ft)'].values[0]
                 acc = current_row['Smoothed Acceleration (g)'].values[0]
 
                 # Calculate max acceleration so far
-                max_acc_so_far = df[df['Time (s)'] <= data_time]['Smoothed Acceleration (g)'].max()
+                now = np.searchsorted(times, data_time, side="right")
+                max_acc_so_far = acc_max_so_far[now - 1] if now else float('nan')
 
                 # Calculate 7s rolling average for ROD
                 rolling_window = 7.0
-                recent_rod = df[(df['Time (s)'] >= data_time - rolling_window) & (df['Time (s)'] <= data_time)]['rate_of_descent_ftps']
+                recent_rod = df['rate_of_descent_ftps'].iloc[np.searchsorted(times, data_time - rolling_window, side="left"):now]
                 rod_avg = recent_rod.mean() if not recent_rod.empty else float('nan')
 
                 # Prepare info text
@@ -11,15 +11,20 @@ import os
 import math
 
 def run_abt_quick_view():
+    # Re-smoothing the same file with other windows reuses the resampled grid
+    Conversions.enable_stage_memo()
     root = tk.Tk()
     root.withdraw()  # Hide the root window
 
+    resmooth = False
     while True:
-        # Get Data and filenames using ReadRawData's dialog
-        Data, Paths = ReadRawData.ReadABT("Select one or more ABT files.")
-        if Data is None or Paths is None:
-            print("No file selected. Exiting.")
-            break
+        # Get Data and filenames using ReadRawData's dialog, or keep the last file to try other smoothing
+        if not resmooth:
+            Data, Paths = ReadRawData.ReadABT("Select one or more ABT files.")
+            if Data is None or Paths is None:
+                print("No file selected. Exiting.")
+                break
+        resmooth = False
 
         # If you want to display all file names:
         file_names = [os.path.basename(p) for p in Paths]
@@ -110,14 +115,8 @@ def run_abt_quick_view():
                 rod = DataUnits["rate_of_descent_ftps"].iloc[idx]
                 t = DataUnits["Time (s)"].iloc[idx]
 
-                # Convert altitude (m) to pressure (Pa)
-                altitude_m = DataUnits["Altitude MSL (m)"].iloc[idx] if "Altitude MSL (m)" in DataUnits.columns else 0.0
-                pressure0_pa = 101325
-                scale_height = 8434  # meters
-                pressure_pa = pressure0_pa * math.exp(-altitude_m / scale_height)
-
-                # SDSL correction using pressure in Pa
-                SDSL_ROD = rod * math.sqrt(pressure_pa / pressure0_pa)
+                # SDSL correction, computed for the whole frame the first time it is needed
+                SDSL_ROD = DataUnits["sdsl_rate_of_descent_ftps"].iloc[idx]
 
                 sel.annotation.set(
                     text=f"Time: {t:.2f}s\nAlt: {alt:.2f} ft\nROD: {rod:.2f} ft/s\nSDSL ROD: {SDSL_ROD:.2f} ft/s",
@@ -202,8 +201,11 @@ def run_abt_quick_view():
 
         plt.show()
 
-        again = input("Process another ABT file? (y/n): ").strip().lower()
-        if again != 'y':
+        # 'r' reuses the resampled data and recomputes only the smoothing stages whose window changed
+        again = input("Process another ABT file? (y/n, r = same file with other smoothing): ").strip().lower()
+        if again == 'r':
+            resmooth = True
+        elif again != 'y':
             break
 
 if __name__ == "__main__":
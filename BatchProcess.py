@@ -0,0 +1,233 @@
+"""
+Headless batch processing of ABT, IMU and FlySight files.
+
+    python BatchProcess.py "D:/Test Week/**/*.csv" --settings batch.json --out results --workers 4
+
+Every input file is read, smoothed with the settings file windows (no prompts, no dialogs) and
+summarised. The output folder gets summary.csv with one row per file, throughput.txt and,
+if write_smoothed is set, one smoothed CSV per ABT/IMU/FlySight sensor file.
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import ReadRawData
+import Conversions
+
+DEFAULT_SETTINGS = {
+    # Every Conversions.SmoothingSettings field except compact, which is set at the top level
+    "smoothing": {"altitude_ms": 500, "acceleration_ms": 100, "rod_ms": 1500, "method": "boxcar", "filter_order": 4,
+                  "savgol_order": 2, "despike_ms": 0, "despike_sigmas": 3.0},
+    "compact": False,
+    "write_smoothed": False,
+}
+
+SUMMARY_COLUMNS = ["file", "kind", "status", "error", "bytes", "seconds", "rows", "duration_s",
+                   "max_altitude_ft", "min_altitude_ft", "altitude_loss_ft", "max_rod_ftps",
+                   "max_acceleration_g", "time_of_max_acceleration_s", "max_horizontal_speed_mph"]
+
+
+def load_settings(Path=None):
+    # Default settings, overridden by whatever the JSON file sets
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    if Path:
+        with open(Path, "r") as file:
+            user = json.load(file)
+        for key, value in user.items():
+            if isinstance(value, dict) and isinstance(settings.get(key), dict):
+                settings[key].update(value)
+            else:
+                settings[key] = value
+    return settings
+
+
+def expand_inputs(inputs):
+    # Directories give their CSV files, anything else is treated as a file name or glob pattern
+    Paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = [os.path.join(item, name) for name in os.listdir(item) if name.lower().endswith(".csv")]
+        else:
+            matches = glob.glob(item, recursive=True)
+        Paths.extend(sorted(match for match in matches if os.path.isfile(match)))
+    # Keep the first occurrence of every file
+    return list(dict.fromkeys(os.path.abspath(Path) for Path in Paths))
+
+
+def detect_kind(Path):
+    """
+    Returns "ABT", "IMU", "FlySightTrack", "FlySightSensor" or None from the first lines of the file.
+    ABT and IMU files are told apart by their number of columns (6 and 16).
+    """
+    with open(Path, "r", errors="replace") as file:
+        lines = [file.readline() for _ in range(40)]
+
+    if lines[0].startswith("$FLYS"):
+        if any(line.startswith(("$GNSS", "$COL,GNSS")) for line in lines):
+            return "FlySightTrack"
+        if any(line.startswith(("$IMU", "$BARO", "$COL,IMU", "$COL,BARO")) for line in lines):
+            return "FlySightSensor"
+        return None
+    if lines[0].lower().startswith("time,lat,lon"):
+        return "FlySightTrack"  # FlySight 1
+
+    for line in lines[10:]:
+        fields = line.strip().split(",")
+        try:
+            float(fields[0])
+        except ValueError:
+            continue
+        if len(fields) == len(ReadRawData.ABT_HEADERS):
+            return "ABT"
+        if len(fields) == len(ReadRawData.IMU_HEADERS):
+            return "IMU"
+        return None
+    return None
+
+
+def _logger_summary(Units):
+    # Metrics from a smoothed ABT/IMU/FlySight sensor frame (resample_and_smooth layout)
+    altitude = Units["Smoothed Altitude MSL (ft)"]
+    acceleration = Units["Smoothed Acceleration (g)"]
+    peak = acceleration.idxmax() if acceleration.notna().any() else None
+    return {
+        "rows": len(Units),
+        "duration_s": float(Units["Time (s)"].iloc[-1]) if len(Units) else 0.0,
+        "max_altitude_ft": float(altitude.max()),
+        "min_altitude_ft": float(altitude.min()),
+        "altitude_loss_ft": float(altitude.iloc[0] - altitude.iloc[-1]),
+        "max_rod_ftps": float(Units["rate_of_descent_ftps"].max()),
+        "max_acceleration_g": float(acceleration.max()),
+        "time_of_max_acceleration_s": float(Units["Time (s)"].loc[peak]) if peak is not None else np.nan,
+    }
+
+
+def _track_summary(Data):
+    # Metrics from a FlySight GPS track
+    altitude = Conversions.MetersToFeet(Data["Altitude MSL"])
+    horizontal = np.sqrt(Data["North Velocity"]**2 + Data["East Velocity"]**2) * 2.23694
+    return {
+        "rows": len(Data),
+        "duration_s": float(Data["Elapsed (s)"].max()),
+        "max_altitude_ft": float(altitude.max()),
+        "min_altitude_ft": float(altitude.min()),
+        "altitude_loss_ft": float(altitude.iloc[0] - altitude.iloc[-1]),
+        "max_rod_ftps": float(Conversions.MetersToFeet(Data["Down Velocity"]).max()),
+        "max_horizontal_speed_mph": float(horizontal.max()),
+    }
+
+
+def process_file(Path, settings, out_dir=None):
+    """
+    Reads, smooths and summarises one file. Never raises, failures are reported in the returned row.
+    """
+    row = {"file": Path, "kind": None, "status": "ok", "error": "", "bytes": 0}
+    # Every file is smoothed once, a stage memo left on by a quick view would only hold memory
+    Conversions.enable_stage_memo(False)
+    start = time.perf_counter()
+    try:
+        row["bytes"] = os.path.getsize(Path)
+        kind = detect_kind(Path)
+        row["kind"] = kind
+        smoothing = Conversions.SmoothingSettings(**settings["smoothing"], compact=settings["compact"])
+
+        if kind in ("ABT", "IMU", "FlySightSensor"):
+            if kind == "ABT":
+                Data = ReadRawData.ReadABTFiles([Path], workers=1, compact=settings["compact"])
+                empty = Data is None or Data.empty
+            elif kind == "IMU":
+                Data = ReadRawData.ReadIMUFiles([Path], workers=1, compact=settings["compact"])
+                empty = Data is None or Data.empty
+            else:
+                Data = ReadRawData.ReadFlySightSensorFile(Path)
+                empty = all(stream.empty for stream in Data.values())
+            if empty:
+                raise ValueError("no data rows")
+            # Same smoothing engine and settings for every logger kind, so the summary rows compare
+            Units = Conversions.resample_and_smooth(Data, kind, smoothing)
+            row.update(_logger_summary(Units))
+            if settings["write_smoothed"] and out_dir:
+                stem = os.path.splitext(os.path.basename(Path))[0]
+                Units.materialize().to_csv(os.path.join(out_dir, f"{stem}_{kind}_smoothed.csv"), index=False)
+        elif kind == "FlySightTrack":
+            row.update(_track_summary(ReadRawData.ReadFlysightTrack(Path)))
+        else:
+            row["status"] = "skipped"
+            row["error"] = "unrecognised file"
+    except Exception as e:
+        row["status"] = "failed"
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = time.perf_counter() - start
+    return row
+
+
+def run_batch(Paths, settings, out_dir, workers=None):
+    # Processes every file over a process pool and writes summary.csv and throughput.txt to out_dir
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    rows = []
+    start = time.perf_counter()
+
+    def report(row):
+        rows.append(row)
+        print(f"[{len(rows)}/{len(Paths)}] {row['status']:7s} {row['kind'] or '-':14s} {row['seconds']:6.2f} s  {row['file']}"
+              + (f"  ({row['error']})" if row["error"] else ""))
+
+    if workers > 1 and len(Paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_file, Path, settings, out_dir) for Path in Paths]
+            for future in as_completed(futures):
+                report(future.result())
+    else:
+        for Path in Paths:
+            report(process_file(Path, settings, out_dir))
+    wall = time.perf_counter() - start
+
+    # Keep the summary in input order regardless of completion order
+    order = {Path: i for i, Path in enumerate(Paths)}
+    rows.sort(key=lambda row: order[row["file"]])
+    Summary = pd.DataFrame(rows).reindex(columns=SUMMARY_COLUMNS)
+    Summary.to_csv(os.path.join(out_dir, "summary.csv"), index=False)
+
+    processed = Summary[Summary["status"] == "ok"]
+    total_mb = Summary["bytes"].sum() / 1e6
+    busy = Summary["seconds"].sum()
+    lines = [
+        f"Files:            {len(Summary)} ({len(processed)} ok, {(Summary['status'] == 'failed').sum()} failed, {(Summary['status'] == 'skipped').sum()} skipped)",
+        "Kinds:            " + ", ".join(f"{kind} {count}" for kind, count in processed["kind"].value_counts().items()),
+        f"Workers:          {workers}",
+        f"Input size:       {total_mb:.1f} MB",
+        f"Wall time:        {wall:.2f} s",
+        f"Throughput:       {len(Summary) / wall:.2f} files/s, {total_mb / wall:.1f} MB/s" if wall > 0 else "Throughput:       -",
+        f"Per-file total:   {busy:.2f} s ({busy / wall:.2f}x wall time)" if wall > 0 else "Per-file total:   -",
+    ]
+    with open(os.path.join(out_dir, "throughput.txt"), "w") as file:
+        file.write("\n".join(lines) + "\n")
+    print("\n".join(lines))
+    return Summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch process ABT, IMU and FlySight files without any dialogs.")
+    parser.add_argument("inputs", nargs="+", help="Directories, files or glob patterns (quote patterns with **)")
+    parser.add_argument("--settings", help="JSON settings file, see DEFAULT_SETTINGS")
+    parser.add_argument("--out", default="batch_results", help="Output folder (default batch_results)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    Paths = expand_inputs(args.inputs)
+    if not Paths:
+        print("No input files found.")
+        return 1
+    settings = load_settings(args.settings)
+    run_batch(Paths, settings, args.out, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# Parsed data files are cached here as one memory-mappable .npy file per column.
+# Set PYPROJECTS_CACHE_DIR to move it, PYPROJECTS_CACHE_MAX_MB to change the size limit
+# and PYPROJECTS_CACHE=0 to turn caching off.
+CACHE_DIR = os.environ.get("PYPROJECTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".pyprojects_cache"))
+CACHE_MAX_BYTES = int(os.environ.get("PYPROJECTS_CACHE_MAX_MB", "2048")) * 1024 * 1024
+CACHE_ENABLED = os.environ.get("PYPROJECTS_CACHE", "1") != "0"
+
+INDEX_NAME = "index.json"
+LOCK_TIMEOUT = 30  # Seconds to wait for the index lock, an older lock file is left over from a crash
+
+
+def _index_path():
+    return os.path.join(CACHE_DIR, INDEX_NAME)
+
+
+def _load_index():
+    try:
+        with open(_index_path(), "r") as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        index = {}
+    index.setdefault("files", {})
+    index.setdefault("entries", {})
+    return index
+
+
+def _save_index(index):
+    # Write to a temporary file first so a crash never leaves a half written index
+    tmp_path = _index_path() + f".{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(index, file)
+    os.replace(tmp_path, _index_path())
+
+
+def content_hash(Path, chunk_size=8 * 1024 * 1024):
+    # BLAKE2b of the whole file, read in large chunks
+    digest = hashlib.blake2b(digest_size=16)
+    with open(Path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _index_lock():
+    # Lock file around every read-modify-write of the index, batch workers share the cache
+    lock_path = _index_path() + ".lock"
+    deadline = time.time() + LOCK_TIMEOUT
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                pass
+            if time.time() > deadline:
+                raise OSError(f"Timed out waiting for the cache lock {lock_path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _update_index(change):
+    """
+    Re-reads the index under the lock, applies change(index) and saves it, so updates made by other
+    processes since this one last read the index are kept. Returns what change returned.
+    """
+    with _index_lock():
+        index = _load_index()
+        result = change(index)
+        _save_index(index)
+    return result
+
+
+def file_fingerprint(Path, index=None):
+    """
+    Returns the content hash of a file. The hash is only recomputed when the path, size or
+    modification time no longer match what the index recorded for it.
+    """
+    index = _load_index() if index is None else index
+    Path = os.path.abspath(Path)
+    stat = os.stat(Path)
+    known = index["files"].get(Path)
+    if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+        return known["hash"]
+    digest = content_hash(Path)
+    index["files"][Path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+    return digest
+
+
+def _store_frame(entry_dir, Data):
+    # One .npy file per column plus a small JSON description of the frame. String columns with missing
+    # values also get a .nulls.npy mask, astype(str) alone would turn them into "nan"
+    tmp_dir = entry_dir + f".{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    meta = {"columns": [], "kinds": [], "tz": [], "nulls": []}
+    for i, col in enumerate(Data.columns):
+        values = Data[col]
+        tz = None
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            tz = str(values.dtype.tz)
+            array = values.dt.tz_localize(None).to_numpy()
+            kind = "datetime"
+        elif pd.api.types.is_datetime64_dtype(values.dtype):
+            array = values.to_numpy()
+            kind = "datetime"
+        elif pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+            array = values.to_numpy()
+            kind = "numeric"
+        else:
+            array = values.astype(str).to_numpy(dtype=str)
+            kind = "string"
+        nulls = kind == "string" and bool(values.isna().any())
+        if nulls:
+            np.save(os.path.join(tmp_dir, f"{i:03d}.nulls.npy"), values.isna().to_numpy())
+        np.save(os.path.join(tmp_dir, f"{i:03d}.npy"), array)
+        meta["columns"].append(str(col))
+        meta["kinds"].append(kind)
+        meta["tz"].append(tz)
+        meta["nulls"].append(nulls)
+
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as file:
+        json.dump(meta, file)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+    return sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+
+
+def _load_frame(entry_dir):
+    with open(os.path.join(entry_dir, "meta.json"), "r") as file:
+        meta = json.load(file)
+
+    # Entries written before "nulls" existed raise KeyError and are re-parsed, their strings may hold "nan"
+    columns = {}
+    for i, (col, kind, tz, nulls) in enumerate(zip(meta["columns"], meta["kinds"], meta["tz"], meta["nulls"])):
+        # Copy-on-write mapping: callers can modify the frame without touching the cache file
+        array = np.load(os.path.join(entry_dir, f"{i:03d}.npy"), mmap_mode="c").view(np.ndarray)
+        if kind == "string":
+            array = array.astype(object)
+            if nulls:
+                array[np.load(os.path.join(entry_dir, f"{i:03d}.nulls.npy"))] = np.nan
+        column = pd.Series(array, copy=False)
+        if tz is not None:
+            column = column.dt.tz_localize(tz)
+        columns[col] = column
+    return pd.DataFrame(columns, copy=False)
+
+
+def _remove_entry(index, name):
+    # Deletes an entry directory, the index keeps the entry while the directory is still there
+    # (memory-mapped columns stay locked on Windows) so it is counted and retried later
+    entry_dir = os.path.join(CACHE_DIR, name)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    if os.path.exists(entry_dir):
+        return False
+    index["entries"].pop(name, None)
+    return True
+
+
+def _evict(index, keep):
+    # Drop least recently used entries until the cache fits its size limit again
+    entries = index["entries"]
+    total = sum(entry["bytes"] for entry in entries.values())
+    for name in sorted(entries, key=lambda name: entries[name]["last_used"]):
+        if total <= CACHE_MAX_BYTES:
+            break
+        if name == keep:
+            continue
+        size = entries[name]["bytes"]
+        if _remove_entry(index, name):
+            total -= size
+
+
+def load_cached(Path, kind):
+    """
+    Returns the cached frame for this exact file content and reader kind, or None on a miss.
+    """
+    if not CACHE_ENABLED:
+        return None
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        index = _load_index()
+        entry_name = f"{kind}-{file_fingerprint(Path, index)}"
+    except OSError as e:
+        print(f"Cache unavailable, reading {Path} directly: {e}")
+        return None
+    known = index["files"][os.path.abspath(Path)]
+
+    Data = None
+    entry_dir = os.path.join(CACHE_DIR, entry_name)
+    if entry_name in index["entries"] and os.path.isdir(entry_dir):
+        try:
+            Data = _load_frame(entry_dir)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Discarding unreadable cache entry {entry_name}: {e}")
+
+    def change(index):
+        # Keep the file hash so store_cached does not hash the file again
+        index["files"][os.path.abspath(Path)] = known
+        if entry_name in index["entries"]:
+            if Data is not None:
+                index["entries"][entry_name]["last_used"] = time.time()
+            else:
+                _remove_entry(index, entry_name)
+
+    try:
+        _update_index(change)
+    except OSError:
+        pass
+    return Data
+
+
+def store_cached(Path, kind, Data):
+    # Adds a parsed frame to the cache, then evicts old entries if the cache is over its size limit
+    if not CACHE_ENABLED:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        index = _load_index()
+        entry_name = f"{kind}-{file_fingerprint(Path, index)}"
+        known = index["files"][os.path.abspath(Path)]
+        # The columns are written outside the lock, only the index update is serialised
+        size = _store_frame(os.path.join(CACHE_DIR, entry_name), Data)
+
+        def change(index):
+            index["files"][os.path.abspath(Path)] = known
+            index["entries"][entry_name] = {"bytes": size, "last_used": time.time()}
+            _evict(index, keep=entry_name)
+
+        _update_index(change)
+    except OSError as e:
+        print(f"Could not cache {Path}: {e}")
+
+
+def cached_read(Path, kind, parser):
+    """
+    Returns parser(Path), reusing the cached columns when this exact file content was already
+    parsed by the same kind of reader. kind names the reader and its output format, e.g. "ABT".
+    """
+    Data = load_cached(Path, kind)
+    if Data is None:
+        Data = parser(Path)
+        store_cached(Path, kind, Data)
+    return Data
+
+
+def invalidate(Path):
+    # Remove every cached parse of one data file
+    def change(index):
+        known = index["files"].pop(os.path.abspath(Path), None)
+        if known:
+            for name in [name for name in index["entries"] if name.endswith("-" + known["hash"])]:
+                _remove_entry(index, name)
+
+    _update_index(change)
+
+
+def clear_cache():
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
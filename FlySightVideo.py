@@ -30,8 +30,6 @@ def FlySightVideo():
 
         # --- LOAD DATA ---
         GPSData = ReadRawData.LoadFlysightData("Select FLysight Data")
-        min_utc = GPSData["UTC"].min()
-        GPSData["Elapsed (s)"] = (GPSData["UTC"] - min_utc).dt.total_seconds()
 
         # Calculate speeds and conversions
         GPSData["Altitude_ft"] = GPSData["Altitude MSL"] * 3.28084
@@ -135,6 +133,12 @@ def FlySightVideo():
         total_min, total_max = GPSData['Total_Speed_mph'].min(), GPSData['Total_Speed_mph'].max()
         glide_min, glide_max = np.nanmin(GPSData['Glide_Ratio']), np.nanmax(GPSData['Glide_Ratio'])
 
+        # --- Per-frame lookups ---
+        # One plan gives the nearest GPS fix for every frame, sorted times let each frame slice its window
+        GPSData = GPSData.sort_values('Elapsed (s)', kind="stable").reset_index(drop=True)
+        times = GPSData['Elapsed (s)'].to_numpy()
+        frame_plan = Conversions.ResamplePlan.cached(times, np.arange(total_frames) / fps - offset)
+
         with tqdm(total=total_frames, desc="Processing video frames") as pbar:
             while cap.isOpened():
                 ret, frame = cap.read()
@@ -171,7 +175,10 @@ def FlySightVideo():
                     else:
                         data_time_clamped = data_time
 
-                    current_row = GPSData.iloc[(GPSData['Elapsed (s)'] - data_time_clamped).abs().argsort()[:1]]
+                    if frame_idx < len(frame_plan.nearest_index):
+                        current_row = GPSData.iloc[[frame_plan.nearest_index[frame_idx]]]
+                    else:  # The container reported fewer frames than it has
+                        current_row = GPSData.iloc[(GPSData['Elapsed (s)'] - data_time_clamped).abs().argsort()[:1]]
                     altitude_ft = current_row['Altitude_ft'].values[0]
                     down_vel_mph = current_row['Down_Vel_mph'].values[0]
                     horiz_speed_mph = current_row['Horiz_Speed_mph'].values[0]
@@ -181,7 +188,7 @@ def FlySightVideo():
                     # --- Get windowed data ---
                     x_min = max(GPSData['Elapsed (s)'].min(), data_time_clamped - plot_win)
                     x_max = min(GPSData['Elapsed (s)'].max(), data_time_clamped + plot_win)
-                    plot_data = GPSData[(GPSData['Elapsed (s)'] >= x_min) & (GPSData['Elapsed (s)'] <= x_max)]
+                    plot_data = GPSData.iloc[np.searchsorted(times, x_min, side="left"):np.searchsorted(times, x_max, side="right")]
 
                     # --- Draw plot background ---
                     overlay = frame.copy()
@@ -13,7 +13,12 @@ def run_FlysightDisplay():
     # Pull in data
     combined, Data, GPSData, rawcombined = Conversions.format_and_smooth_FS_data()
     combined = Conversions.align_baro_to_gps(combined)
-    KulCombined = Conversions.kalman_fuse_gps_baro(combined)
+    # The multi-rate filter updates with GPS only at the real fixes instead of the 100 Hz interpolation
+    use_fixes = input("Apply GPS only at its real fix times (multi-rate Kalman)? [y/n]: ").strip().lower() == "y"
+    if use_fixes:
+        KulCombined = Conversions.kalman_fuse_gps_fixes(combined, GPSData)
+    else:
+        KulCombined = Conversions.kalman_fuse_gps_baro(combined)
 
     # Convert Kalman outputs to feet
     KulCombined["KF Altitude (ft)"] = KulCombined["KF Altitude (m)"] * 3.28084
@@ -134,6 +139,37 @@ def run_FlysightDisplay():
         if len(selected_points) > 2:
             selected_points.pop(0)
 
+    # --- Kalman tuning sliders ---
+    # Re-fuse the cached, aligned arrays and update the lines in place (no dialogs or prompts)
+    from matplotlib.widgets import Slider
+
+    tuner = Conversions.KalmanTuner(combined, GPSData if use_fixes else None)
+    slider_specs = [("R_baro", 0.1, 50.0, 10.0), ("Q", 0.01, 5.0, 0.5)]
+    if not use_fixes:
+        slider_specs.insert(0, ("R_gps", 0.1, 50.0, 4.0))  # The multi-rate filter takes the GPS noise from vAcc
+    fig.subplots_adjust(bottom=0.1 + 0.05 * len(slider_specs))
+    sliders = {}
+    for row, (name, low, high, start) in enumerate(slider_specs):
+        sliders[name] = Slider(fig.add_axes([0.15, 0.02 + 0.05 * row, 0.55, 0.03]), name, low, high, valinit=start)
+
+    def on_slider_change(value):
+        q = sliders["Q"].val
+        R_gps = sliders["R_gps"].val if "R_gps" in sliders else 4
+        kf_alt, kf_vspeed = tuner.fuse(R_gps, sliders["R_baro"].val, [[q, 0.0], [0.0, q]])
+        KulCombined["KF Altitude (m)"] = kf_alt
+        KulCombined["KF Vertical Speed (m/s)"] = kf_vspeed
+        KulCombined["KF Altitude (ft)"] = kf_alt * 3.28084
+        KulCombined["KF Vertical Speed (ft/s)"] = kf_vspeed * 3.28084
+        df["KF Altitude (ft)"] = KulCombined["KF Altitude (ft)"]
+        df["KF Vertical Speed (ft/s)"] = KulCombined["KF Vertical Speed (ft/s)"]
+        l1.set_ydata(KulCombined["KF Altitude (ft)"])
+        l2.set_ydata(-1 * KulCombined["KF Vertical Speed (ft/s)"])
+        auto_rescale_y_axes(ax1, ax2, ax3)
+        fig.canvas.draw_idle()
+
+    for slider in sliders.values():
+        slider.on_changed(on_slider_change)
+
     plt.show()
 
     # Plot all three on the same axis for comparison - WITH AUTO-RESCALING
@@ -10,202 +10,40 @@ import mplcursors
 import os
 import math
 
-def format_and_smooth_flysight_sensor_data(Data):
+def format_and_smooth_flysight_sensor_data(Data, settings=None):
     """
     Formats and smooths Flysight sensor data for quick view display.
-    Similar to ABT formatting but adapted for Flysight sensor structure.
+    Runs the shared Conversions.resample_and_smooth engine on a 100 Hz grid, prompting for the
+    smoothing windows unless settings is given.
     """
-    
-    # Default values for smoothing windows
-    default_alt_ms = 500
-    default_acc_ms = 100
-    default_rod_ms = 1500
-
-    use_defaults = input(
-        f"Use default smoothing windows? (altitude={default_alt_ms} ms, acceleration={default_acc_ms} ms, ROD={default_rod_ms} ms) [y/n]: "
-    ).strip().lower()
-
-    if use_defaults == "y":
-        smoothness_alt_ms = default_alt_ms
-        smoothness_acc_ms = default_acc_ms
-        smoothness_rod_ms = default_rod_ms
-    else:
-        smoothness_alt_ms = int(input("Enter smoothing window for altitude (ms, default 500): ") or default_alt_ms)
-        smoothness_acc_ms = int(input("Enter smoothing window for acceleration (ms, default 100): ") or default_acc_ms)
-        smoothness_rod_ms = int(input("Enter smoothing window for rate of descent (ms, default 1500): ") or default_rod_ms)
-
-    # Clean and sort by Time (s)
-    Data = Data.dropna(subset=["Time (s)"])
-    
-    # Convert all numeric columns to proper numeric types with error handling
-    numeric_columns = ["Time (s)", "Ax (g)", "Ay (g)", "Az (g)", "Pressure (Pa)", "Temperature (deg C)",
-                      "Relative Humidity (%)", "X Mag (gauss)", "Y Mag (gauss)", "Z Mag (gauss)", 
-                      "Wx (deg/s)", "Wy (deg/s)", "Wz (deg/s)", "voltage (V)"]
-    
-    for col in numeric_columns:
-        if col in Data.columns:
-            Data[col] = pd.to_numeric(Data[col], errors='coerce')
-    
-    Data = Data.sort_values("Time (s)")
-    Data = Data.drop_duplicates(subset=["Time (s)"], keep="first")
-    
-    # Remove rows where Time is NaN after conversion
-    Data = Data.dropna(subset=["Time (s)"])
-    
-    if len(Data) == 0:
-        raise ValueError("No valid time data found after cleaning")
-    
-    if len(Data) < 2:
-        raise ValueError(f"Not enough data points ({len(Data)}) for interpolation. Need at least 2 points.")
-
-    # --- Create master time grid at 100 Hz (Flysight typical rate) ---
-    t_min = Data["Time (s)"].min()
-    t_max = Data["Time (s)"].max()
-    
-    if pd.isna(t_min) or pd.isna(t_max) or t_max <= t_min:
-        raise ValueError(f"Invalid time range: {t_min} to {t_max}")
-    
-    time_span = t_max - t_min
-    if time_span < 0.01:  # Less than 10ms
-        raise ValueError(f"Time span too short: {time_span:.6f} seconds")
-    
-    # Use relative time for better interpolation precision with large absolute times
-    Data_relative = Data.copy()
-    Data_relative["Time (s)"] = Data["Time (s)"] - t_min
-    
-    new_time_relative = np.arange(0, time_span, 1/100)  # 100 Hz from 0 to time_span
-
-    # --- Interpolate acceleration data ---
-    # Only use valid IMU data points, don't fill NaN with zeros
-    
-    # Get only rows with valid acceleration data (actual IMU measurements)
-    valid_imu_data = Data_relative[
-        Data_relative["Ax (g)"].notna() & 
-        Data_relative["Ay (g)"].notna() & 
-        Data_relative["Az (g)"].notna()
-    ].copy()
-    
-    if len(valid_imu_data) < 2:
-        raise ValueError(f"Not enough valid IMU data points ({len(valid_imu_data)}) for interpolation")
-    
-    # Convert to numeric for valid data only
-    valid_imu_data["Ax (g)"] = pd.to_numeric(valid_imu_data["Ax (g)"], errors='coerce')
-    valid_imu_data["Ay (g)"] = pd.to_numeric(valid_imu_data["Ay (g)"], errors='coerce')
-    valid_imu_data["Az (g)"] = pd.to_numeric(valid_imu_data["Az (g)"], errors='coerce')
-    
-    # Remove any rows that became NaN after numeric conversion
-    valid_imu_data = valid_imu_data.dropna(subset=["Ax (g)", "Ay (g)", "Az (g)"])
-    
-    if len(valid_imu_data) < 2:
-        raise ValueError(f"Not enough valid numeric IMU data ({len(valid_imu_data)}) after conversion")
-    
-    # Interpolate using ONLY valid IMU data points
-    ax_interp = np.interp(new_time_relative, valid_imu_data["Time (s)"], valid_imu_data["Ax (g)"])
-    ay_interp = np.interp(new_time_relative, valid_imu_data["Time (s)"], valid_imu_data["Ay (g)"])
-    az_interp = np.interp(new_time_relative, valid_imu_data["Time (s)"], valid_imu_data["Az (g)"])
-
-    # --- Interpolate pressure data ---
-    if "Pressure (Pa)" in Data_relative.columns:
-        valid_pressure_data = Data_relative[Data_relative["Pressure (Pa)"].notna()].copy()
-        if len(valid_pressure_data) > 0:
-            valid_pressure_data["Pressure (Pa)"] = pd.to_numeric(valid_pressure_data["Pressure (Pa)"], errors='coerce')
-            valid_pressure_data = valid_pressure_data.dropna(subset=["Pressure (Pa)"])
-            if len(valid_pressure_data) > 0:
-                p_interp = np.interp(new_time_relative, valid_pressure_data["Time (s)"], valid_pressure_data["Pressure (Pa)"])
-            else:
-                p_interp = np.full_like(new_time_relative, 101325)
-        else:
-            p_interp = np.full_like(new_time_relative, 101325)
-    else:
-        p_interp = np.full_like(new_time_relative, 101325)
-
-    # --- Interpolate temperature data ---
-    if "Temperature (deg C)" in Data_relative.columns:
-        valid_temp_data = Data_relative[Data_relative["Temperature (deg C)"].notna()].copy()
-        if len(valid_temp_data) > 0:
-            valid_temp_data["Temperature (deg C)"] = pd.to_numeric(valid_temp_data["Temperature (deg C)"], errors='coerce')
-            valid_temp_data = valid_temp_data.dropna(subset=["Temperature (deg C)"])
-            if len(valid_temp_data) > 0:
-                t_interp = np.interp(new_time_relative, valid_temp_data["Time (s)"], valid_temp_data["Temperature (deg C)"])
-            else:
-                t_interp = np.full_like(new_time_relative, 15)
-        else:
-            t_interp = np.full_like(new_time_relative, 15)
-    else:
-        t_interp = np.full_like(new_time_relative, 15)
-
-    # --- Calculate barometric altitude ---
-    altitude_msl_m = 44330 * (1 - (p_interp / 101325) ** (1 / 5.255))
-
-    # --- Build DataFrame ---
-    # Keep time starting at 0
-    DataUnits = pd.DataFrame({
-        "Time (s)": new_time_relative,  # Already starts at 0
-        "Ax (g)": ax_interp,
-        "Ay (g)": ay_interp,
-        "Az (g)": az_interp,
-        "Altitude MSL (m)": altitude_msl_m,
-        "Temperature (deg C)": t_interp,
-        "Pressure (Pa)": p_interp
-    })
-
-    # --- Set index to Timedelta for time-based rolling ---
-    # Use relative time for timedelta calculation to avoid precision issues
-    DataUnits = DataUnits.set_index(pd.to_timedelta(new_time_relative, unit='s'))
-
-    # --- Apply smoothing using time-based rolling ---
-    DataUnits["Smoothed Altitude MSL (ft)"] = Conversions.MetersToFeet(
-        DataUnits["Altitude MSL (m)"].rolling(f"{smoothness_alt_ms}ms", min_periods=1).mean()
-    )
-    
-    DataUnits["Smoothed Ax"] = DataUnits["Ax (g)"].rolling(f"{smoothness_acc_ms}ms", min_periods=1).mean()
-    DataUnits["Smoothed Ay"] = DataUnits["Ay (g)"].rolling(f"{smoothness_acc_ms}ms", min_periods=1).mean()
-    DataUnits["Smoothed Az"] = DataUnits["Az (g)"].rolling(f"{smoothness_acc_ms}ms", min_periods=1).mean()
-
-    # Calculate acceleration magnitude (RMS) - this should be around 1g when stationary
-    DataUnits["Smoothed Acceleration (g)"] = np.sqrt(
-        DataUnits["Smoothed Ax"]**2 + 
-        DataUnits["Smoothed Ay"]**2 + 
-        DataUnits["Smoothed Az"]**2
-    )
-    
-
-
-    # Calculate Rate of Descent (ROD)
-    DataUnits["altitude_diff"] = DataUnits["Smoothed Altitude MSL (ft)"].diff()
-    DataUnits["time_diff"] = DataUnits["Time (s)"].diff()
-    DataUnits["rate_of_descent_ftps"] = -DataUnits["altitude_diff"] / DataUnits["time_diff"]
-    DataUnits["rate_of_descent_ftps"] = DataUnits["rate_of_descent_ftps"].fillna(0)
-
-    # Smooth ROD
-    DataUnits["rate_of_descent_ftps"] = DataUnits["rate_of_descent_ftps"].rolling(
-        f"{smoothness_rod_ms}ms", min_periods=1
-    ).mean()
-
-    # Reset index to keep "Time (s)" as a column
-    DataUnits = DataUnits.reset_index(drop=True)
-
-    return DataUnits
+    if settings is None:
+        settings = Conversions.SmoothingSettings.from_prompt()
+    return Conversions.resample_and_smooth(Data, "FlySightSensor", settings)
 
 
 def run_flysight_sensor_quick_view():
+    # Re-smoothing the same file with other windows reuses the resampled grid
+    Conversions.enable_stage_memo()
     root = tk.Tk()
     root.withdraw()  # Hide the root window
 
+    resmooth = False
     while True:
-        # Get Flysight sensor data using ReadRawData's dialog
-        try:
-            Data = ReadRawData.FlySightSensorRead("Select Flysight sensor file")
-            if Data is None or Data.empty:
-                print("No file selected. Exiting.")
+        # Get Flysight sensor data using ReadRawData's dialog, or keep the last file to try other smoothing
+        if not resmooth:
+            try:
+                Data = ReadRawData.FlySightSensorRead("Select Flysight sensor file")
+                if Data is None or Data.empty:
+                    print("No file selected. Exiting.")
+                    break
+
+                # Get a simple display name
+                file_name_display = "Flysight Sensor Data"
+
+            except Exception as e:
+                print(f"Error reading file: {e}")
                 break
-                
-            # Get a simple display name
-            file_name_display = "Flysight Sensor Data"
-            
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            break
+        resmooth = False
 
         # Format and smooth the Flysight sensor data
         try:
@@ -382,8 +220,11 @@ def run_flysight_sensor_quick_view():
 
         plt.show()
 
-        again = input("Process another Flysight sensor file? (y/n): ").strip().lower()
-        if again != 'y':
+        # 'r' reuses the resampled data and recomputes only the smoothing stages whose window changed
+        again = input("Process another Flysight sensor file? (y/n, r = same file with other smoothing): ").strip().lower()
+        if again == 'r':
+            resmooth = True
+        elif again != 'y':
             break
 
 
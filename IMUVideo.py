@@ -30,12 +30,16 @@ def IMUVideo():
 
         # --- LOAD DATA ---
         # Get Data and filenames using ReadRawData's dialog
-        Data, file_paths = ReadRawData.ReadIMU("Select one or more IMU file(s).")
+        minutes = input("Minutes of data to load before the end of the recording (blank = all): ").strip()
+        last_seconds = float(minutes) * 60 if minutes else None
+        Data, file_paths = ReadRawData.ReadIMU("Select one or more IMU file(s).", last_seconds=last_seconds)
         if Data is None or file_paths is None:
             print("No file selected. Exiting.")
             break
         file_name = os.path.basename(file_paths[0])
-        df = Conversions.format_and_smooth_imu_data(Data)  # Use your smoothing function
+        # Only the channels the overlay draws are computed, before df gets sliced into plain frames
+        df = Conversions.format_and_smooth_imu_data(Data).materialize(
+            ["Smoothed Altitude MSL (ft)", "Smoothed Acceleration (g)", "rate_of_descent_ftps"])
 
         # --- Let user pick landing in IMU data by clicking the graph interactively ---
         clicked_time = []
@@ -91,6 +95,13 @@ def IMUVideo():
         plot_x = 0
         plot_y = frame_height - plot_height
 
+        # --- Per-frame lookups ---
+        # Every frame's data time is known up front, so one plan gives the nearest sample for all of
+        # them and the sorted times let each frame slice its windows instead of masking the whole frame
+        times = df['Time (s)'].to_numpy()
+        frame_plan = Conversions.ResamplePlan.cached(times, np.arange(total_frames) / fps - offset)
+        acc_max_so_far = np.fmax.accumulate(df['Smoothed Acceleration (g)'].to_numpy())
+
         with tqdm(total=total_frames, desc="Processing video frames") as pbar:
             while cap.isOpened():
                 ret, frame = cap.read()
@@ -103,7 +114,7 @@ def IMUVideo():
                 # --- Get windowed data ---
                 x_min = max(0, data_time - plot_win)
                 x_max = data_time + plot_win
-                plot_data = df[(df['Time (s)'] >= x_min) & (df['Time (s)'] <= x_max)]
+                plot_data = df.iloc[np.searchsorted(times, x_min, side="left"):np.searchsorted(times, x_max, side="right")]
 
                 # --- Auto-scale axes for the current window ---
                 if len(plot_data) > 1:
@@ -225,18 +236,22 @@ def IMUVideo():
                     )
 
                 # --- Draw text display (top right, gray box, 7s avg for ROD) ---
-                idx = (df['Time (s)'] - data_time).abs().idxmin()
+                if frame_idx < len(frame_plan.nearest_index):
+                    idx = frame_plan.nearest_index[frame_idx]
+                else:  # The container reported fewer frames than it has
+                    idx = (df['Time (s)'] - data_time).abs().idxmin()
                 current_row = df.iloc[[idx]]
                 altitude = current_row['Smoothed Altitude MSL (ft)'].values[0]
                 acc_val = current_row['Smoothed Acceleration (g)'].values[0]
 
                 # 7s rolling average for ROD
                 rolling_window = 7.0
-                recent_rod = df[(df['Time (s)'] >= data_time - rolling_window) & (df['Time (s)'] <= data_time)]['rate_of_descent_ftps']
+                now = np.searchsorted(times, data_time, side="right")
+                recent_rod = df['rate_of_descent_ftps'].iloc[np.searchsorted(times, data_time - rolling_window, side="left"):now]
                 rod_avg = recent_rod.mean() if not recent_rod.empty else float('nan')
 
                 # Max acceleration so far
-                max_acc_so_far = df[df['Time (s)'] <= data_time]['Smoothed Acceleration (g)'].max()
+                max_acc_so_far = acc_max_so_far[now - 1] if now else float('nan')
 
                 info_text = [
                     f"Alt: {altitude:,.0f} ft",
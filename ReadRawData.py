@@ -1,22 +1,42 @@
+import csv
+import io
+import mmap
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog
+import DataCache
 
 def LoadFlysightData(prompt):
     #Loads flysight data into pandas data frame and copensates for it it is FS 1 or FS 2
     #Note: this deletes the first few lines of data to account for some data having headers
-    
-    
-    #Importing Data
-    
-    
+    #Parsed files are cached by DataCache so reopening the same track is instant
+    #Adds UTC (tz-aware), UTC (ns) as int64 epoch nanoseconds and Elapsed (s) since the first fix
+
+    #File dialog
+    Path = filedialog.askopenfilename(title=prompt)
+
+    return ReadFlysightTrack(Path)
+
+
+def ReadFlysightTrack(Path):
+    # Same as LoadFlysightData for a known path, without the dialog
+    return DataCache.cached_read(Path, "FlySightTrack2", _parse_flysight_track)
+
+
+# FlySight GNSS timestamps, e.g. 2023-09-21T18:00:00.20Z (%z accepts the Z and keeps pandas on its ISO fast path)
+FLYSIGHT_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+
+def _parse_flysight_track(Path):
     #Defing Columns
     DataHeaders = ["Time", "Latitude", "Longitude", "Altitude MSL", "North Velocity", "East Velocity", "Down Velocity", "hAcc", "vAcc", "sAcc", "heading", "cAcc", "gpsFix", "numSV"]
     DataHeaders2 = ["Time", "Latitude", "Longitude", "Altitude MSL", "North Velocity", "East Velocity", "Down Velocity", "hAcc", "vAcc", "sAcc", "numSV"]
-    
-    
-    #File dialog
-    Path = filedialog.askopenfilename(title=prompt)
 
     #Read CSV File
     Data = pd.read_csv(Path,skiprows = 7)
@@ -29,149 +49,699 @@ def LoadFlysightData(prompt):
     else:
         Data.columns = DataHeaders
     
-    Data["UTC"] = pd.to_datetime(Data["Time"])
+    # Parse the ISO-8601 timestamps once with a fixed format, tools reuse these columns instead of parsing again
+    try:
+        Data["UTC"] = pd.to_datetime(Data["Time"], format=FLYSIGHT_TIME_FORMAT, utc=True)
+    except ValueError:
+        Data["UTC"] = pd.to_datetime(Data["Time"], format="ISO8601", utc=True)
+    utc_ns = Data["UTC"].dt.as_unit("ns").array.asi8
+    Data["UTC (ns)"] = utc_ns
+    Data["Elapsed (s)"] = (utc_ns - utc_ns.min()) / 1e9
     return Data
 
 
+# Column layout of the wide FlySight sensor frame
+FLYSIGHT_SENSOR_COLUMNS = ["Time (s)", "Pressure (Pa)", "Temperature (deg C)", 
+                           "Relative Humidity (%)", "X Mag (gauss)", "Y Mag (gauss)", 
+                           "Z Mag (gauss)", "Wx (deg/s)", "Wy (deg/s)", "Wz (deg/s)", 
+                           "Ax (g)", "Ay (g)", "Az (g)", "tow (s)", "week", "voltage (V)"]
+
+# Fields carried by each FlySight 2 SENSOR.CSV record type, in file order after the time column
+FLYSIGHT_SENSOR_RECORDS = {
+    "$IMU": ["Wx (deg/s)", "Wy (deg/s)", "Wz (deg/s)", "Ax (g)", "Ay (g)", "Az (g)", "Temperature (deg C)"],
+    "$BARO": ["Pressure (Pa)"],
+    "$MAG": ["X Mag (gauss)", "Y Mag (gauss)", "Z Mag (gauss)"],
+    "$HUM": ["Relative Humidity (%)"],
+    "$TIME": ["tow (s)", "week"],
+    "$VBAT": ["voltage (V)"],
+}
+
+
+class FlySightSensorStreams(dict):
+    """
+    FlySight 2 sensor data as one dense DataFrame per record type, keyed by stream name
+    ("IMU", "BARO", "MAG", "HUM", "TIME", "VBAT"). Every stream has its own "Time (s)" timebase.
+    """
+
+    @property
+    def empty(self):
+        return all(stream.empty for stream in self.values())
+
+    def to_wide(self):
+        """Rebuild the old single wide frame: one sensor record per row, NaN in the other sensors' columns."""
+        columns = list(FLYSIGHT_SENSOR_COLUMNS)
+        for stream in self.values():
+            columns += [col for col in stream.columns if col not in columns]
+        Wide = pd.concat(self.values(), ignore_index=True).reindex(columns=columns)
+        return Wide.sort_values("Time (s)", kind="stable").reset_index(drop=True)
+
+
+def _read_flysight_sensor_records(Path):
+    # Parse the whole file in one C-engine pass and split it by record tag into dense float blocks
+    width = 2 + max(len(fields) for fields in FLYSIGHT_SENSOR_RECORDS.values())
+    Raw = pd.read_csv(
+        Path,
+        skiprows=17,
+        header=None,
+        names=range(width),
+        usecols=range(width),
+        dtype={0: "category"},
+    )
+    tags = Raw[0]
+
+    Streams = FlySightSensorStreams()
+    for tag, fields in FLYSIGHT_SENSOR_RECORDS.items():
+        names = ["Time (s)"] + fields
+        rows = Raw.loc[(tags == tag).to_numpy(), range(1, len(names) + 1)]
+        rows.columns = names
+        for col in names:
+            if rows[col].dtype != np.float64:
+                rows[col] = pd.to_numeric(rows[col], errors="coerce")
+        rows = rows.astype(np.float64).dropna(subset=["Time (s)"])
+        Streams[tag.lstrip("$")] = rows.sort_values("Time (s)", kind="stable").reset_index(drop=True)
+    return Streams
+
+
 def FlySightSensorRead(prompt):
-    # Define column names
-    DataHeaders = ["Time (s)", "Pressure (Pa)", "Temperature (deg C)", 
-                   "Relative Humidity (%)", "X Mag (gauss)", "Y Mag (gauss)", 
-                   "Z Mag (gauss)", "Wx (deg/s)", "Wy (deg/s)", "Wz (deg/s)", 
-                   "Ax (g)", "Ay (g)", "Az (g)", "tow (s)", "week", "voltage (V)"]
+    # Returns a FlySightSensorStreams with one dense table per sensor, use .to_wide() for the old layout
 
     # File dialog
     Path = filedialog.askopenfilename(title=prompt)
     if not Path:
-        return pd.DataFrame(columns=DataHeaders)
+        return FlySightSensorStreams(
+            (tag.lstrip("$"), pd.DataFrame(columns=["Time (s)"] + fields, dtype=np.float64))
+            for tag, fields in FLYSIGHT_SENSOR_RECORDS.items()
+        )
 
-    # Read file line by line
-    parsed_rows = []
-    with open(Path, "r") as file:
-        lines = file.readlines()[17:]  # Skip the first 17 lines
+    return ReadFlySightSensorFile(Path)
 
-        for line in lines:
-            columns = line.strip().split(",")  # Split line into columns
-            row_data = {key: None for key in DataHeaders}  # Blank row
-            tag = columns[0] if len(columns) > 0 else None  # Get the tag
 
-            try:
-                if tag == "$IMU" and len(columns) >= 9:
-                    row_data["Time (s)"] = columns[1]
-                    row_data["Wx (deg/s)"] = columns[2]
-                    row_data["Wy (deg/s)"] = columns[3]
-                    row_data["Wz (deg/s)"] = columns[4]
-                    row_data["Ax (g)"] = columns[5]
-                    row_data["Ay (g)"] = columns[6]
-                    row_data["Az (g)"] = columns[7]
-                    row_data["Temperature (deg C)"] = columns[8]
-                elif tag == "$BARO" and len(columns) >= 3:
-                    row_data["Time (s)"] = columns[1]
-                    row_data["Pressure (Pa)"] = columns[2]
-                elif tag == "$MAG" and len(columns) >= 5:
-                    row_data["Time (s)"] = columns[1]
-                    row_data["X Mag (gauss)"] = columns[2]
-                    row_data["Y Mag (gauss)"] = columns[3]
-                    row_data["Z Mag (gauss)"] = columns[4]
-                elif tag == "$HUM" and len(columns) >= 3:
-                    row_data["Time (s)"] = columns[1]
-                    row_data["Relative Humidity (%)"] = columns[2]
-                elif tag == "$TIME" and len(columns) >= 4:
-                    row_data["Time (s)"] = columns[1]
-                    row_data["tow (s)"] = columns[2]
-                    row_data["week"] = columns[3]
-                elif tag == "$VBAT" and len(columns) >= 3:
-                    row_data["Time (s)"] = columns[1]
-                    row_data["voltage (V)"] = columns[2]
-                parsed_rows.append(row_data)
-            except IndexError:
-                print(f"Skipping malformed row: {line.strip()}")
-                continue
-
-    # Convert parsed rows to DataFrame
-    NData = pd.DataFrame(parsed_rows, columns=DataHeaders)
-    
-    # Convert all numeric columns to proper numeric types
-    numeric_columns = ["Time (s)", "Pressure (Pa)", "Temperature (deg C)", 
-                      "Relative Humidity (%)", "X Mag (gauss)", "Y Mag (gauss)", 
-                      "Z Mag (gauss)", "Wx (deg/s)", "Wy (deg/s)", "Wz (deg/s)", 
-                      "Ax (g)", "Ay (g)", "Az (g)", "tow (s)", "week", "voltage (V)"]
-    
-    for col in numeric_columns:
-        if col in NData.columns:
-            NData[col] = pd.to_numeric(NData[col], errors="coerce")
-    
-    NData = NData.sort_values("Time (s)").reset_index(drop=True)
+def ReadFlySightSensorFile(Path):
+    # Same as FlySightSensorRead for a known path, without the dialog
+    return _read_flysight_sensor_records(Path)
 
-    
-    return NData
 
 
 
 
+ABT_HEADERS = ["Time", "Ax", "Ay", "Az", "P", "T"]
+IMU_HEADERS = ["Time", "Ax", "Ay", "Az", "Gx", "Gy", "Gz", "Qw", "Qx", "Qy", "Qz", "Mx", "My", "Mz", "P", "T"]
 
-def ReadABT(prompt):
-    DataHeaders = ["Time", "Ax", "Ay", "Az", "P", "T"]
-    Paths = filedialog.askopenfilenames(title=prompt)
-    if not Paths:
-        return None, None
 
+# "typed" parses straight to float64 and quarantines malformed lines, "legacy" is the old string + to_numeric path
+PARSE_MODE = "typed"
+
+# Compact mode keeps time in float64 and stores every sensor channel as float32
+COMPACT_DTYPE = np.float32
+
+
+def CompactFrame(Data, keep=("Time",)):
+    # Returns Data with its float64 columns stored as float32, except the (time) columns in keep
+    columns = [col for col in Data.columns if col not in keep and Data[col].dtype == np.float64]
+    return Data.astype({col: COMPACT_DTYPE for col in columns})
+
+
+# Strings the CSV parser already treats as missing values, these are not malformed
+NA_STRINGS = {"", "nan", "NaN", "NAN", "-nan", "NA", "N/A", "n/a", "null", "NULL", "None"}
+
+try:
+    import pyarrow  # noqa: F401
+    FAST_CSV_ENGINE = "pyarrow"
+except ImportError:
+    FAST_CSV_ENGINE = "c"
+
+
+def _parse_logger_csv(Path, names, skiprows):
+    Data = pd.read_csv(
+        Path,
+        skiprows=skiprows,
+        header=None,
+        names=names,
+        dtype={"Time": str},         # Read as string to clean up
+        low_memory=False             # Suppress warning
+    )
+    return Data.apply(pd.to_numeric, errors='coerce')
+
+
+# Spare columns for lines with too many fields, lines with even more fall back to _quarantine_parse_lines
+QUARANTINE_EXTRA_FIELDS = 8
+
+
+def _quarantine_parse(Path, names, skiprows):
+    """
+    Path for files the typed parse rejects. The C parser reads the file with spare columns and its
+    own type inference: columns that come back numeric need no further work, only columns holding
+    text are checked cell by cell. The raw text is read only to report the malformed lines.
+    """
+    extra = [f"_extra{i}" for i in range(QUARANTINE_EXTRA_FIELDS)]
+    try:
+        Data = pd.read_csv(
+            Path,
+            skiprows=skiprows,
+            header=None,
+            names=names + extra,
+            skip_blank_lines=False,
+            low_memory=False,
+        )
+    except pd.errors.ParserError:
+        return _quarantine_parse_lines(Path, names, skiprows)
+
+    bad = Data[extra].notna().any(axis=1).to_numpy().copy()
+    Data = Data[names]
+    for col in names:
+        if not pd.api.types.is_numeric_dtype(Data[col].dtype):
+            values = pd.to_numeric(Data[col], errors="coerce").astype(np.float64)
+            # Only cells that did not convert are looked at as text
+            suspect = (values.isna() & Data[col].notna()).to_numpy()
+            if suspect.any():
+                text = Data[col][suspect].astype(str).str.strip()
+                bad[suspect] |= ~text.isin(NA_STRINGS).to_numpy()
+            Data[col] = values
+        elif Data[col].dtype != np.float64:
+            Data[col] = Data[col].astype(np.float64)
+
+    # Empty rows are blank lines (dropped) or lines of empty fields (kept), only the raw text tells them apart
+    empty = Data.isna().all(axis=1).to_numpy() & ~bad
+    quarantined = []
+    blank = np.zeros(len(Data), dtype=bool)
+    if bad.any() or empty.any():
+        raw = _raw_lines(Path, skiprows)
+        line_numbers = skiprows + 1 + np.arange(len(raw))
+        blank[empty] = (raw[empty].str.strip() == "").to_numpy()
+        quarantined = list(zip(line_numbers[bad].tolist(), raw[bad].str.rstrip("\r").tolist()))
+    Data = Data[~bad & ~blank].reset_index(drop=True)
+    return Data, quarantined
+
+
+def _raw_lines(Path, skiprows):
+    # Every line after skiprows as text (with any \r left on), one row per line including blank ones
+    Lines = pd.read_csv(
+        Path,
+        skiprows=skiprows,
+        header=None,
+        names=["raw"],
+        sep="\x1f",
+        quoting=csv.QUOTE_NONE,
+        dtype=str,
+        na_filter=False,
+        skip_blank_lines=False,
+    )
+    return Lines["raw"]
+
+
+def _quarantine_parse_lines(Path, names, skiprows):
+    # Slowest path, for lines with more fields than _quarantine_parse has room for: read each line whole,
+    # then check field counts and numbers per cell
+    Lines = pd.read_csv(
+        Path,
+        skiprows=skiprows,
+        header=None,
+        names=["raw"],
+        sep="\x1f",
+        quoting=csv.QUOTE_NONE,
+        dtype=str,
+        na_filter=False,
+        skip_blank_lines=False,
+    )
+    raw = Lines["raw"].str.rstrip("\r")
+    line_numbers = skiprows + 1 + np.arange(len(raw))
+    blank = (raw.str.strip() == "").to_numpy()
+
+    fields = raw.str.split(",", expand=True)
+    too_many = (fields.shape[1] > len(names)) & fields.iloc[:, len(names):].notna().any(axis=1).to_numpy()
+    fields = fields.reindex(columns=range(len(names)))
+
+    Data = pd.DataFrame(index=Lines.index)
+    bad = too_many.copy()
+    for i, col in enumerate(names):
+        text = fields[i].str.strip()
+        values = pd.to_numeric(text, errors="coerce")
+        bad |= (values.isna() & text.notna() & ~text.isin(NA_STRINGS)).to_numpy()
+        Data[col] = values.astype(np.float64)
+
+    bad &= ~blank
+    quarantined = list(zip(line_numbers[bad].tolist(), raw[bad].tolist()))
+    Data = Data[~bad & ~blank].reset_index(drop=True)
+    return Data, quarantined
+
+
+def ReadLoggerCSVTyped(Path, names, skiprows, report=None):
+    """
+    Typed parse of an ABT/IMU style CSV: every column is declared float64 up front and read by the
+    fastest engine available. Lines that do not parse are left out and listed in report["quarantined"]
+    as (line number, raw text) instead of silently becoming NaN. report also receives the engine used,
+    parse time and peak traced memory so it can be compared with the legacy path. Memory is only
+    traced when a report is passed in, tracing slows parsing down several times.
+    """
+    tracing = report is not None and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    if report is not None:
+        tracemalloc.reset_peak()
+    report = {} if report is None else report
+    start = time.perf_counter()
+
+    try:
+        Data = pd.read_csv(
+            Path,
+            skiprows=skiprows,
+            header=None,
+            names=names,
+            dtype={name: np.float64 for name in names},
+            engine=FAST_CSV_ENGINE,
+        )
+        quarantined = []
+        report["engine"] = FAST_CSV_ENGINE
+    except ValueError:
+        Data, quarantined = _quarantine_parse(Path, names, skiprows)
+        report["engine"] = "quarantine"
+
+    report["parse_seconds"] = time.perf_counter() - start
+    if tracemalloc.is_tracing():
+        report["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    if tracing:
+        tracemalloc.stop()
+    report["rows"] = len(Data)
+    report["quarantined"] = quarantined
+
+    if quarantined:
+        _write_quarantine_report(Path, quarantined)
+    return Data
+
+
+def _write_quarantine_report(Path, quarantined):
+    # Side report next to the data file: one "line number,raw text" row per skipped line
+    print(f"Quarantined {len(quarantined)} malformed line(s) in {Path}, first at line {quarantined[0][0]}: {quarantined[0][1]!r}")
+    try:
+        with open(Path + ".quarantine.txt", "w") as file:
+            file.write("line,raw\n")
+            for line_number, raw in quarantined:
+                file.write(f"{line_number},{raw}\n")
+    except OSError as e:
+        print(f"Could not write quarantine report for {Path}: {e}")
+
+
+def _parse_logger_file(Path, names, skiprows, mode="typed"):
+    if mode == "legacy":
+        return _parse_logger_csv(Path, names, skiprows)
+    return ReadLoggerCSVTyped(Path, names, skiprows)
+
+
+def CompareParseModes(Path, kind="ABT"):
+    # Parses one file with the legacy and the typed path and returns both timing/memory reports
+    names, skiprows = (ABT_HEADERS, 11) if kind == "ABT" else (IMU_HEADERS, 10)
+
+    legacy = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    Legacy = _parse_logger_csv(Path, names, skiprows)
+    legacy["parse_seconds"] = time.perf_counter() - start
+    legacy["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    legacy["rows"] = len(Legacy)
+    legacy["nan_cells"] = int(Legacy.isna().sum().sum())
+
+    typed = {}
+    Typed = ReadLoggerCSVTyped(Path, names, skiprows, typed)
+    typed["nan_cells"] = int(Typed.isna().sum().sum())
+
+    for label, result in (("legacy", legacy), ("typed", typed)):
+        print(f"{label:7s} {result['parse_seconds']:.3f} s, peak {result['peak_bytes'] / 1e6:.1f} MB, {result['rows']} rows")
+    return {"legacy": legacy, "typed": typed}
+
+
+def _read_logger_files(Paths, kind, parser, workers=None):
+    """
+    Reads every file independently (cache hits directly, misses in a process pool) and then
+    applies the cumulative time offsets, giving the same frame as reading the files one by one.
+    """
+    frames = [None] * len(Paths)
+    misses = []
+    for idx, Path in enumerate(Paths):
+        try:
+            frames[idx] = DataCache.load_cached(Path, kind)
+        except Exception as e:
+            print(f"Failed to read file {Path}: {e}")
+            continue
+        if frames[idx] is None:
+            misses.append(idx)
+
+    if workers is None:
+        workers = min(len(misses), os.cpu_count() or 1)
+
+    if len(misses) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {idx: pool.submit(parser, Paths[idx]) for idx in misses}
+            for idx, future in futures.items():
+                try:
+                    frames[idx] = future.result()
+                    DataCache.store_cached(Paths[idx], kind, frames[idx])
+                except Exception as e:
+                    print(f"Failed to read file {Paths[idx]}: {e}")
+    else:
+        for idx in misses:
+            try:
+                frames[idx] = parser(Paths[idx])
+                DataCache.store_cached(Paths[idx], kind, frames[idx])
+            except Exception as e:
+                print(f"Failed to read file {Paths[idx]}: {e}")
+
+    # Stitch: each file is offset by the last (already offset) time of the file before it
     data_frames = []
     time_offset = 0
-    for idx, Path in enumerate(Paths):
+    for idx, Data in enumerate(frames):
+        if Data is None:
+            continue
+        # Offset time for all but the first file
+        if idx > 0:
+            Data["Time"] += time_offset
+        time_offset = Data["Time"].iloc[-1]  # Update offset for next file
+        data_frames.append(Data)
+
+    if data_frames:
+        return pd.concat(data_frames, ignore_index=True)
+    return None
+
+
+# Sparse (time, byte offset) checkpoints are kept next to each log as <file>.tidx.npz so a time
+# window can be read by seeking into the memory-mapped file instead of parsing all of it
+TIME_INDEX_EVERY = 4096
+TIME_INDEX_BLOCK = 64 * 1024 * 1024
+
+
+def _first_field_time(buf, start):
+    # Time value at the start of the line beginning at byte offset start, None if it does not parse
+    end = buf.find(b"\n", start, start + 256)
+    line = buf[start:end if end != -1 else start + 256]
+    try:
+        return float(line.split(b",", 1)[0])
+    except ValueError:
+        return None
+
+
+def BuildTimeIndex(Path, skiprows, every=TIME_INDEX_EVERY):
+    """
+    Scans the file once for line starts and records the time and byte offset of every
+    every-th data line, plus the time of the last line. Saved as Path + ".tidx.npz".
+    """
+    stat = os.stat(Path)
+    times, offsets = [], []
+    data_start = stat.st_size
+    last_time = np.nan
+    with open(Path, "rb") as file:
+        buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        try:
+            line_count = 0  # Lines started before the current block
+            for block_start in range(0, stat.st_size, TIME_INDEX_BLOCK):
+                block = np.frombuffer(buf, dtype=np.uint8, count=min(TIME_INDEX_BLOCK, stat.st_size - block_start), offset=block_start)
+                # Line k + 1 starts after the k-th newline, line 0 starts at byte 0
+                starts = np.flatnonzero(block == 10) + block_start + 1
+                line_numbers = line_count + 1 + np.arange(len(starts))
+                if block_start == 0:
+                    starts = np.concatenate(([0], starts))
+                    line_numbers = np.concatenate(([0], line_numbers))
+                line_count += int(np.count_nonzero(block == 10))
+                keep = (line_numbers >= skiprows) & ((line_numbers - skiprows) % every == 0) & (starts < stat.st_size)
+                for start in starts[keep].tolist():
+                    if data_start == stat.st_size:
+                        data_start = start
+                    value = _first_field_time(buf, start)
+                    if value is not None and np.isfinite(value):
+                        times.append(value)
+                        offsets.append(start)
+                del block
+
+            # Last line with a readable time
+            end = stat.st_size
+            while end > data_start:
+                start = buf.rfind(b"\n", data_start, end - 1) + 1
+                start = max(start, data_start)
+                value = _first_field_time(buf, start)
+                if value is not None and np.isfinite(value):
+                    last_time = value
+                    break
+                end = start
+        finally:
+            if stat.st_size:
+                buf.close()
+
+    index = {
+        "monotonic": _times_monotonic(Path, skiprows),
+        "times": np.asarray(times, dtype=np.float64),
+        "offsets": np.asarray(offsets, dtype=np.int64),
+        "data_start": data_start,
+        "last_time": last_time,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "skiprows": skiprows,
+        "every": every,
+    }
+    try:
+        with open(Path + ".tidx.npz", "wb") as file:
+            np.savez(file, **index)
+    except OSError as e:
+        print(f"Could not save time index for {Path}, keeping it in memory: {e}")
+    return index
+
+
+def _times_monotonic(Path, skiprows):
+    # True when no Time in the file is smaller than the one before it, checkpoints alone miss
+    # backward steps between them. Unparseable files count as not monotonic.
+    try:
+        times = pd.read_csv(Path, skiprows=skiprows, header=None, usecols=[0], dtype=np.float64, engine=FAST_CSV_ENGINE)[0].to_numpy()
+    except (ValueError, IndexError):
+        return False
+    times = times[~np.isnan(times)]
+    return bool(np.all(np.diff(times) >= 0))
+
+
+def LoadTimeIndex(Path, skiprows, every=TIME_INDEX_EVERY):
+    # Returns the sidecar index, rebuilding it when the file changed since it was written
+    stat = os.stat(Path)
+    try:
+        with np.load(Path + ".tidx.npz") as saved:
+            index = {key: saved[key] for key in saved.files}
+        for key in ("monotonic", "data_start", "last_time", "size", "mtime_ns", "skiprows", "every"):
+            index[key] = index[key].item()
+        if (index["size"], index["mtime_ns"], index["skiprows"], index["every"]) == (stat.st_size, stat.st_mtime_ns, skiprows, every):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    return BuildTimeIndex(Path, skiprows, every)
+
+
+def ReadLoggerWindow(Path, names, skiprows, t_start=None, t_end=None):
+    """
+    Reads only the rows with t_start <= Time <= t_end (file time, None = open ended) by parsing
+    the byte range between the surrounding index checkpoints. Falls back to a full typed parse
+    when the times are not increasing or the range holds malformed lines.
+    """
+    t_lo = -np.inf if t_start is None else t_start
+    t_hi = np.inf if t_end is None else t_end
+    Data = _read_logger_range(Path, names, skiprows, t_lo, t_hi)
+    in_window = (Data["Time"] >= t_lo) & (Data["Time"] <= t_hi)
+    return Data[in_window.to_numpy()].reset_index(drop=True)
+
+
+def _read_logger_range(Path, names, skiprows, t_lo, t_hi):
+    # Unmasked rows of a byte range holding every row with t_lo <= Time <= t_hi, one checkpoint wider
+    # on each side so callers can mask on a shifted time scale without losing rows to rounding
+    index = LoadTimeIndex(Path, skiprows)
+    times, offsets = index["times"], index["offsets"]
+
+    Data = None
+    if len(times) and index["monotonic"]:
+        i = np.searchsorted(times, t_lo, side="right") - 2
+        j = np.searchsorted(times, t_hi, side="right") + 1
+        start = int(offsets[i]) if i >= 0 else index["data_start"]
+        end = int(offsets[j]) if j < len(offsets) else index["size"]
+        with open(Path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                chunk = buf[start:end]
         try:
             Data = pd.read_csv(
-                Path,
-                skiprows=11,
+                io.BytesIO(chunk),
                 header=None,
-                names=DataHeaders,
-                dtype={"Time": str},         # Read as string to clean up
-                low_memory=False             # Suppress warning
+                names=names,
+                dtype={name: np.float64 for name in names},
+                engine=FAST_CSV_ENGINE,
             )
-            Data = Data.apply(pd.to_numeric, errors='coerce')
-            # Offset time for all but the first file
-            if idx > 0:
-                Data["Time"] += time_offset
-            time_offset = Data["Time"].iloc[-1]  # Update offset for next file
-            data_frames.append(Data)
+        except ValueError:
+            Data = None
+    if Data is None:
+        Data = ReadLoggerCSVTyped(Path, names, skiprows)
+    return Data
+
+
+def _stitched_offsets(Paths, skiprows):
+    # Per-file time offsets matching _read_logger_files, taken from each index's last time
+    indices, offsets = [], []
+    time_offset = 0
+    for Path in Paths:
+        try:
+            index = LoadTimeIndex(Path, skiprows)
+        except Exception as e:
+            print(f"Failed to read file {Path}: {e}")
+            indices.append(None)
+            offsets.append(None)
+            continue
+        indices.append(index)
+        offsets.append(time_offset)
+        if np.isfinite(index["last_time"]):
+            time_offset += index["last_time"]
+    return indices, offsets
+
+
+def LoggerTimeRange(Paths, kind="ABT"):
+    # (first, last) stitched time across the files, read from the indexes only
+    skiprows = 11 if kind == "ABT" else 10
+    indices, offsets = _stitched_offsets(Paths, skiprows)
+    first = [index["times"][0] + offset for index, offset in zip(indices, offsets) if index is not None and len(index["times"])]
+    last = [index["last_time"] + offset for index, offset in zip(indices, offsets) if index is not None]
+    if not first:
+        return None, None
+    return float(min(first)), float(np.nanmax(last))
+
+
+def _read_logger_window(Paths, names, skiprows, time_window):
+    # Windowed version of _read_logger_files, time_window is (start, end) in stitched time
+    t_start, t_end = time_window
+    indices, offsets = _stitched_offsets(Paths, skiprows)
+    data_frames = []
+    for Path, index, offset in zip(Paths, indices, offsets):
+        if index is None:
+            continue
+        # Skip files that lie completely outside the window
+        if t_end is not None and len(index["times"]) and index["times"][0] + offset > t_end:
+            continue
+        if t_start is not None and index["last_time"] + offset < t_start:
+            continue
+        # Rows are masked on stitched time, per-file bounds (t - offset) can round past boundary rows
+        t_lo = -np.inf if t_start is None else t_start
+        t_hi = np.inf if t_end is None else t_end
+        try:
+            Data = _read_logger_range(Path, names, skiprows, t_lo - offset, t_hi - offset)
         except Exception as e:
             print(f"Failed to read file {Path}: {e}")
+            continue
+        Data["Time"] += offset
+        in_window = (Data["Time"] >= t_lo) & (Data["Time"] <= t_hi)
+        data_frames.append(Data[in_window.to_numpy()].reset_index(drop=True))
 
     if data_frames:
-        merged_data = pd.concat(data_frames, ignore_index=True)
+        return pd.concat(data_frames, ignore_index=True)
+    return None
+
+
+def ReadABTFiles(Paths, workers=None, time_window=None, compact=False):
+    # Reads ABT files without any dialog, returns the merged frame or None
+    # time_window=(start, end) in stitched seconds loads only that span through the time index
+    # compact=True stores the sensor channels as float32 (time stays float64)
+    if time_window is not None:
+        Data = _read_logger_window(Paths, ABT_HEADERS, 11, time_window)
+    else:
+        parser = partial(_parse_logger_file, names=ABT_HEADERS, skiprows=11, mode=PARSE_MODE)
+        Data = _read_logger_files(Paths, "ABT-" + PARSE_MODE, parser, workers)
+    if compact and Data is not None:
+        Data = CompactFrame(Data)
+    return Data
+
+
+def ReadIMUFiles(Paths, workers=None, time_window=None, compact=False):
+    # Reads IMU files without any dialog, returns the merged frame or None
+    # time_window=(start, end) in stitched seconds loads only that span through the time index
+    # compact=True stores the sensor channels as float32 (time stays float64)
+    if time_window is not None:
+        Data = _read_logger_window(Paths, IMU_HEADERS, 10, time_window)
+    else:
+        parser = partial(_parse_logger_file, names=IMU_HEADERS, skiprows=10, mode=PARSE_MODE)
+        Data = _read_logger_files(Paths, "IMU-" + PARSE_MODE, parser, workers)
+    if compact and Data is not None:
+        Data = CompactFrame(Data)
+    return Data
+
+
+def ReadABT(prompt, time_window=None, last_seconds=None, compact=False):
+    # time_window=(start, end) or last_seconds=N loads only part of the recording
+    Paths = filedialog.askopenfilenames(title=prompt)
+    if not Paths:
+        return None, None
+
+    if last_seconds is not None:
+        _, t_end = LoggerTimeRange(Paths, "ABT")
+        if t_end is not None:
+            time_window = (t_end - last_seconds, None)
+    merged_data = ReadABTFiles(Paths, time_window=time_window, compact=compact)
+    if merged_data is not None:
         return merged_data, Paths
     else:
         return None, None
 
-def ReadIMU(prompt):
-    DataHeaders = ["Time", "Ax", "Ay", "Az", "Gx", "Gy", "Gz", "Qw", "Qx", "Qy", "Qz", "Mx", "My", "Mz", "P", "T"]
+def ReadIMU(prompt, time_window=None, last_seconds=None, compact=False):
+    # time_window=(start, end) or last_seconds=N loads only part of the recording
     Paths = filedialog.askopenfilenames(title=prompt)
     if not Paths:
         return None, None
 
-    data_frames = []
+    if last_seconds is not None:
+        _, t_end = LoggerTimeRange(Paths, "IMU")
+        if t_end is not None:
+            time_window = (t_end - last_seconds, None)
+    merged_data = ReadIMUFiles(Paths, time_window=time_window, compact=compact)
+    if merged_data is not None:
+        return merged_data, Paths
+    else:
+        return None, None
+
+
+def IterLoggerChunks(Paths, names, skiprows, chunksize=250000):
+    # Yields time-ordered chunks across all files, carrying the same cumulative time offset as ReadABT/ReadIMU
     time_offset = 0
     for idx, Path in enumerate(Paths):
+        last_time = None
         try:
-            Data = pd.read_csv(
+            reader = pd.read_csv(
                 Path,
-                skiprows=10,
+                skiprows=skiprows,
                 header=None,
-                names=DataHeaders,
-                dtype={"Time": str},         # Read as string to clean up
-                low_memory=False             # Suppress warning
+                names=names,
+                dtype={"Time": str},
+                chunksize=chunksize
             )
-            Data = Data.apply(pd.to_numeric, errors='coerce')
-            # Offset time for all but the first file
-            if idx > 0:
-                Data["Time"] += time_offset
-            time_offset = Data["Time"].iloc[-1]  # Update offset for next file
-            data_frames.append(Data)
+            with reader:
+                for Chunk in reader:
+                    Chunk = Chunk.apply(pd.to_numeric, errors='coerce')
+                    # Offset time for all but the first file
+                    if idx > 0:
+                        Chunk["Time"] += time_offset
+                    last_time = Chunk["Time"].iloc[-1]
+                    yield Chunk
         except Exception as e:
             print(f"Failed to read file {Path}: {e}")
+            continue
+        if last_time is not None:
+            time_offset = last_time  # Update offset for next file
 
-    if data_frames:
-        merged_data = pd.concat(data_frames, ignore_index=True)
-        return merged_data, Paths
-    else:
-        return None, None
\ No newline at end of file
+
+def IterABTChunks(Paths, chunksize=250000):
+    return IterLoggerChunks(Paths, ABT_HEADERS, 11, chunksize)
+
+
+def IterIMUChunks(Paths, chunksize=250000):
+    return IterLoggerChunks(Paths, IMU_HEADERS, 10, chunksize)
+
+
+def ReadABTChunks(prompt, chunksize=250000):
+    # Same dialog as ReadABT but returns a chunk generator instead of one merged frame
+    Paths = filedialog.askopenfilenames(title=prompt)
+    if not Paths:
+        return None, None
+    return IterABTChunks(Paths, chunksize), Paths
+
+
+def ReadIMUChunks(prompt, chunksize=250000):
+    # Same dialog as ReadIMU but returns a chunk generator instead of one merged frame
+    Paths = filedialog.askopenfilenames(title=prompt)
+    if not Paths:
+        return None, None
+    return IterIMUChunks(Paths, chunksize), Paths
@@ -24,12 +24,9 @@ def WindCompensation():
         WindPack = ReadRawData.LoadFlysightData("Select Wind Pack data")
         JumperRaw = ReadRawData.LoadFlysightData("Select Jumper Flysight data")
 
-        #Creating Data Frame Time Format Column
-        WindPack["FormattedTime"] = pd.to_datetime(WindPack["Time"])
-        WindPack["TimeSinceStart (s)"] = (WindPack["FormattedTime"] - WindPack["FormattedTime"].iloc[0]).dt.total_seconds()
-
-        JumperRaw["FormattedTime"] = pd.to_datetime(JumperRaw["Time"])
-        JumperRaw["TimeSinceStart (s)"] = (JumperRaw["FormattedTime"] - JumperRaw["FormattedTime"].iloc[0]).dt.total_seconds()
+        #Time since the first row, from the columns the loader already parsed
+        WindPack["TimeSinceStart (s)"] = (WindPack["UTC (ns)"] - WindPack["UTC (ns)"].iloc[0]) / 1e9
+        JumperRaw["TimeSinceStart (s)"] = (JumperRaw["UTC (ns)"] - JumperRaw["UTC (ns)"].iloc[0]) / 1e9
 
 
 
@@ -89,14 +86,14 @@ def WindCompensation():
         #Assign Clicked Points to variables
 
         # Use ClickedPointsX (time in seconds since start) to define your window
-        StartTime = pd.to_timedelta(min(ClickedPointsX), unit="s") + WindPack["FormattedTime"].iloc[0]
-        EndTime = pd.to_timedelta(max(ClickedPointsX), unit="s") + WindPack["FormattedTime"].iloc[0]
+        StartTime = pd.to_timedelta(min(ClickedPointsX), unit="s").value + WindPack["UTC (ns)"].iloc[0]
+        EndTime = pd.to_timedelta(max(ClickedPointsX), unit="s").value + WindPack["UTC (ns)"].iloc[0]
 
         # Mask data outside the selected time window
-        mask = (WindPack["FormattedTime"] >= StartTime) & (WindPack["FormattedTime"] <= EndTime)
+        mask = (WindPack["UTC (ns)"] >= StartTime) & (WindPack["UTC (ns)"] <= EndTime)
         filteredWindPack = WindPack[mask]
 
-        mask = (JumperRaw["FormattedTime"] >= StartTime) & (JumperRaw["FormattedTime"] <= EndTime)
+        mask = (JumperRaw["UTC (ns)"] >= StartTime) & (JumperRaw["UTC (ns)"] <= EndTime)
         filteredJumperRaw = JumperRaw[mask]
 
         #Creating a function that describes wind(Altitude)
@@ -147,8 +144,8 @@ def WindCompensation():
                 title="Save CSV File as"
         )
         if ExportPath:
-            # Drop the last three columns before exporting
-            JumperCorrected = JumperCorrected.iloc[:, :-3]
+            # Drop the columns added after reading before exporting
+            JumperCorrected = JumperCorrected.drop(columns=["UTC", "UTC (ns)", "Elapsed (s)", "TimeSinceStart (s)"])
 
             # Now insert $GNSS and export
             JumperCorrected.insert(0, "$GNSS", "$GNSS")